@@ -8,19 +8,26 @@ being fetched from all API endpoints. It provides a comprehensive view of the
 data structure without duplicates.
 """
 
-import json
-import os
+import sys
 import logging
+from collections import deque
 from typing import Dict, Set, Any, List
 from datetime import datetime
+import ijson
 import config
 
 # ─── LOGGER SETUP ──────────────────────────────────────────────────────────
 logger = config.setup_logger('all_fetched_json_fields', 'all_fetched_json_fields.log')
 
+_CONTAINER_TYPES = (dict, list)
+
 def extract_fields_from_object(obj: Any, prefix: str = "", fields_set: Set[str] = None) -> Set[str]:
     """
-    Recursively extract all field paths from a JSON object
+    Extract all field paths from a JSON object
+    
+    Walks the tree with an explicit stack instead of recursion, so deeply
+    nested responses cannot hit the recursion limit. Only containers are
+    pushed; scalar leaves are recorded without a stack round trip.
     
     Args:
         obj: The JSON object to analyze
@@ -33,132 +40,182 @@ def extract_fields_from_object(obj: Any, prefix: str = "", fields_set: Set[str]
     if fields_set is None:
         fields_set = set()
     
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            current_path = f"{prefix}.{key}" if prefix else key
-            fields_set.add(current_path)
-            extract_fields_from_object(value, current_path, fields_set)
-    elif isinstance(obj, list) and obj:
-        # Analyze first item in array to get structure
-        if len(obj) > 0:
-            array_prefix = f"{prefix}[0]" if prefix else "[0]"
-            extract_fields_from_object(obj[0], array_prefix, fields_set)
+    add_field = fields_set.add
+    stack = deque([(obj, prefix)])
+    push = stack.append
+    pop = stack.pop
+    
+    while stack:
+        node, path = pop()
+        node_type = type(node)
+        if node_type is dict:
+            for key, value in node.items():
+                current_path = f"{path}.{key}" if path else key
+                add_field(current_path)
+                if type(value) in _CONTAINER_TYPES:
+                    push((value, current_path))
+        elif node_type is list and node:
+            # Analyze first item in array to get structure
+            push((node[0], f"{path}[0]" if path else "[0]"))
     
     return fields_set
 
+def _shape_key(obj: Any) -> Any:
+    """
+    Build a hashable fingerprint of a JSON value's structure
+    
+    Captures dict keys, value types and nesting (first array item only, as in
+    extract_fields_from_object) but not the values, so entries with equal
+    keys always yield the same field paths. Parsed JSON only contains plain
+    dicts and lists, so exact type checks are used.
+    
+    Uses the same explicit stack as extract_fields_from_object, so deep
+    nesting cannot hit the recursion limit. The key is a flat pre-order token
+    sequence: each dict contributes its key and value-type tuples, which also
+    tell how many nested containers follow, and each list contributes
+    whether it has a first item.
+    
+    Args:
+        obj: The JSON value to fingerprint
+    
+    Returns:
+        Flat tuple describing the structure
+    """
+    tokens = [type(obj)]
+    add_token = tokens.append
+    stack = [obj]
+    push = stack.append
+    pop = stack.pop
+    
+    while stack:
+        node = pop()
+        node_type = type(node)
+        if node_type is dict:
+            values = node.values()
+            add_token(tuple(node))
+            add_token(tuple(map(type, values)))
+            for value in values:
+                if type(value) in _CONTAINER_TYPES:
+                    push(value)
+        elif node_type is list:
+            add_token(bool(node))
+            if node:
+                push(node[0])
+    
+    return tuple(tokens)
+
 def find_latest_json_file() -> str:
     """
     Find the latest JSON data file
     
     Returns:
-        Path to the latest JSON file
+        Path to the latest NDJSON (or legacy JSON) data file
     """
-    json_files = [f for f in os.listdir('.') if f.startswith('json_fetch_data_') and f.endswith('.json')]
-    if not json_files:
+    latest = config.find_latest_data_file()
+    if latest is None:
         raise FileNotFoundError("No JSON data files found")
     
-    return sorted(json_files)[-1]
+    return latest
 
-def main():
+def main(json_file: str = None):
     """
     Main function to analyze JSON fields
+    
+    Args:
+        json_file: Data file to analyze (e.g. a .zst archive); defaults to
+            the latest daily file
     """
     try:
         logger.info("🔍 STARTING JSON FIELDS ANALYSIS")
         logger.info("=" * 60)
         
-        # Find the latest JSON file
-        json_file = find_latest_json_file()
+        # Find the latest JSON file unless one was given
+        if json_file is None:
+            json_file = find_latest_json_file()
         logger.info(f"📁 Analyzing file: {json_file}")
         
         # Track fields by endpoint
         endpoint_fields = {}
-        all_fields = set()
         entries_processed = 0
+        # (endpoint, structure) pairs already merged into endpoint_fields;
+        # a repeated pair cannot add new fields and is skipped entirely
+        seen_shapes = set()
         
-        # Read and parse the entire JSON file
-        with open(json_file, 'r', encoding='utf-8') as f:
-            logger.info("📖 Loading JSON data file...")
-            
-            try:
-                # Try to load the entire file
-                data = json.load(f)
-                logger.info(f"✅ JSON file loaded successfully")
-                
-                # Check if it has the expected structure
-                if 'entries' in data:
-                    entries = data['entries']
-                    logger.info(f"📊 Found {len(entries)} total entries")
+        # Stream entries one at a time instead of loading the whole file
+        logger.info("📖 Streaming JSON data file...")
+        try:
+            for entry in config.iter_entries(json_file, logger):
+                if entry.get('type') == 'api_data':
+                    endpoint = entry.get('endpoint', 'unknown')
+                    entry_data = entry.get('data', {})
                     
-                    # Process each entry
-                    for entry in entries:
-                        if isinstance(entry, dict) and entry.get('type') == 'api_data':
-                            endpoint = entry.get('endpoint', 'unknown')
-                            entry_data = entry.get('data', {})
+                    if entry_data:
+                        # Only entries with a structure not yet seen for this
+                        # endpoint are traversed and merged
+                        shape = (endpoint, _shape_key(entry_data))
+                        if shape not in seen_shapes:
+                            seen_shapes.add(shape)
                             
-                            if entry_data:
-                                # Extract fields from this entry's data
-                                entry_fields = extract_fields_from_object(entry_data)
-                                
-                                # Add to endpoint-specific fields
-                                if endpoint not in endpoint_fields:
-                                    endpoint_fields[endpoint] = set()
-                                endpoint_fields[endpoint].update(entry_fields)
-                                
-                                # Add to all fields
-                                all_fields.update(entry_fields)
-                                
-                                entries_processed += 1
-                                
-                                # Log progress every 50 entries
-                                if entries_processed % 50 == 0:
-                                    logger.info(f"📊 Processed {entries_processed} API entries...")
-                    
-                else:
-                    logger.error("❌ JSON file doesn't have expected 'entries' structure")
-                    return
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ Failed to parse JSON file: {str(e)}")
-                return
-            except Exception as e:
-                logger.error(f"❌ Error reading file: {str(e)}")
-                return
+                            # Extract fields straight into this endpoint's set
+                            extract_fields_from_object(
+                                entry_data, fields_set=endpoint_fields.setdefault(endpoint, set())
+                            )
+                        
+                        entries_processed += 1
+                        
+                        # Log progress every 50 entries
+                        if entries_processed % 50 == 0:
+                            logger.info(f"📊 Processed {entries_processed} API entries...")
+            
+        except ijson.JSONError as e:
+            # Keep whatever was parsed before the file stopped being valid JSON
+            logger.warning(f"⚠️ Stopped reading at invalid JSON, using entries parsed so far: {str(e)}")
+        except Exception as e:
+            logger.error(f"❌ Error reading file: {str(e)}")
+            return
+    
+        # All fields is the union of the endpoint sets
+        all_fields = set().union(*endpoint_fields.values())
         
         logger.info(f"✅ Analysis complete! Processed {entries_processed} API entries")
         logger.info("=" * 60)
         
-        # Log results by endpoint
-        logger.info("📡 FIELDS BY ENDPOINT:")
-        logger.info("=" * 60)
-        
-        for endpoint, fields in endpoint_fields.items():
-            logger.info(f"")
-            logger.info(f"🔹 {endpoint.upper()} ENDPOINT ({len(fields)} fields):")
-            logger.info("-" * 40)
+        # Write the report in one batch rather than one file write per record
+        with config.buffered_logging(logger):
+            # Log results by endpoint
+            logger.info("📡 FIELDS BY ENDPOINT:")
+            logger.info("=" * 60)
             
-            for field in sorted(fields):
-                logger.info(f"  • {field}")
-        
-        # Log summary
-        logger.info("")
-        logger.info("📊 SUMMARY:")
-        logger.info("=" * 60)
-        logger.info(f"Total endpoints analyzed: {len(endpoint_fields)}")
-        logger.info(f"Total unique fields: {len(all_fields)}")
-        logger.info(f"Entries processed: {entries_processed}")
-        
-        # Log all unique fields
-        logger.info("")
-        logger.info("🌟 ALL UNIQUE FIELDS (NO DUPLICATES):")
-        logger.info("=" * 60)
-        
-        for field in sorted(all_fields):
-            logger.info(f"  • {field}")
-        
-        logger.info("")
-        logger.info("🎉 Field analysis completed successfully!")
-        logger.info(f"📁 Results logged to: all_fetched_json_fields.log")
+            for endpoint, fields in endpoint_fields.items():
+                logger.info(f"")
+                logger.info(f"🔹 {endpoint.upper()} ENDPOINT ({len(fields)} fields):")
+                logger.info("-" * 40)
+                
+                # One multi-line record per endpoint instead of one per field
+                if fields:
+                    logger.info("\n".join(f"  • {field}" for field in sorted(fields)))
+            
+            # Log summary
+            logger.info("")
+            logger.info("📊 SUMMARY:")
+            logger.info("=" * 60)
+            logger.info(f"Total endpoints analyzed: {len(endpoint_fields)}")
+            logger.info(f"Total unique fields: {len(all_fields)}")
+            logger.info(f"Entries processed: {entries_processed}")
+            logger.info(f"Distinct entry structures: {len(seen_shapes)}")
+            
+            # Log all unique fields
+            logger.info("")
+            logger.info("🌟 ALL UNIQUE FIELDS (NO DUPLICATES):")
+            logger.info("=" * 60)
+            
+            sorted_fields = sorted(all_fields)
+            if sorted_fields:
+                logger.info("\n".join(f"  • {field}" for field in sorted_fields))
+            
+            logger.info("")
+            logger.info("🎉 Field analysis completed successfully!")
+            logger.info(f"📁 Results logged to: all_fetched_json_fields.log")
         
         # Also print summary to console
         print(f"\n✅ Analysis Complete!")
@@ -168,7 +225,7 @@ def main():
         # Print a sample of fields to console
         if all_fields:
             print(f"\n📋 Sample of fields found:")
-            sample_fields = sorted(list(all_fields))[:20]  # Show first 20 fields
+            sample_fields = sorted_fields[:20]  # Show first 20 fields
             for field in sample_fields:
                 print(f"  • {field}")
             if len(all_fields) > 20:
@@ -181,4 +238,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None) 
\ No newline at end of file
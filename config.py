@@ -7,15 +7,23 @@ This file contains all configuration settings for timezone, date formatting,
 and other universal settings used across all scripts.
 """
 
+import io
 import os
+import glob
+import time
 import logging
-from datetime import datetime, timezone, timedelta
+import logging.handlers
+from contextlib import contextmanager
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import ijson
+import orjson
+import zstandard as zstd
 
 # ─── TIMEZONE CONFIGURATION ───────────────────────────────────────────────────
 # New York Eastern Time Zone (UTC-5 standard, UTC-4 daylight)
-# Using system timezone approach for better compatibility
-EASTERN_OFFSET = timedelta(hours=-5)  # EST (will auto-adjust for DST)
-EASTERN_TZ = timezone(EASTERN_OFFSET)
+# zoneinfo applies the DST switch automatically
+EASTERN_TZ = ZoneInfo("America/New_York")
 
 # Set system timezone to Eastern (for system-wide consistency)
 os.environ['TZ'] = 'America/New_York'
@@ -36,11 +44,7 @@ LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
 # ─── UTILITY FUNCTIONS ────────────────────────────────────────────────────────
 def get_current_time():
     """Get current time in Eastern timezone"""
-    # Get current UTC time and convert to Eastern
-    utc_now = datetime.utcnow()
-    # Simple Eastern conversion (this will need manual DST adjustment)
-    eastern_now = utc_now - timedelta(hours=5)  # EST
-    return eastern_now
+    return datetime.now(EASTERN_TZ)
 
 def format_timestamp(dt=None):
     """Format datetime to MM/DD/YYYY HH:MM:SS AM/PM in Eastern timezone"""
@@ -69,19 +73,43 @@ def get_file_date_suffix():
     return get_current_time().strftime("%Y-%m-%d")
 
 # ─── LOGGING CONFIGURATION ────────────────────────────────────────────────────
+# Bound at module level so formatTime only does global lookups; records are
+# shifted by the EASTERN_TZ offset and formatted from gmtime() without
+# building a datetime per record
+_STRFTIME = time.strftime
+_GMTIME = time.gmtime
+
 class EasternTimeFormatter(logging.Formatter):
     """Custom formatter that uses Eastern timezone"""
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Formats have one-second resolution, so records within the same
+        # second reuse the last formatted string
+        self._cached_key = None
+        self._cached_time = ""
+        # US DST switches happen on whole UTC hours, so the EASTERN_TZ offset
+        # is fixed within one and only needs looking up once per hour
+        self._offset_hour = None
+        self._offset_seconds = 0
+    
     def formatTime(self, record, datefmt=None):
         """Override formatTime to use Eastern timezone"""
-        # Convert UTC timestamp to Eastern
-        utc_dt = datetime.utcfromtimestamp(record.created)
-        eastern_dt = utc_dt - timedelta(hours=5)  # EST
+        cache_key = (int(record.created), datefmt)
+        if cache_key == self._cached_key:
+            return self._cached_time
+        
+        hour = int(record.created // 3600)
+        if hour != self._offset_hour:
+            offset = datetime.fromtimestamp(hour * 3600, EASTERN_TZ).utcoffset()
+            self._offset_hour = hour
+            self._offset_seconds = offset.total_seconds()
         
-        if datefmt:
-            return eastern_dt.strftime(datefmt)
-        else:
-            return eastern_dt.strftime(DATETIME_FORMAT)
+        formatted = _STRFTIME(datefmt or DATETIME_FORMAT, _GMTIME(record.created + self._offset_seconds))
+        
+        self._cached_key = cache_key
+        self._cached_time = formatted
+        return formatted
 
 def setup_logger(name, log_file, level=logging.INFO):
     """Setup a logger with Eastern timezone formatting"""
@@ -107,6 +135,80 @@ def setup_logger(name, log_file, level=logging.INFO):
     
     return logger
 
+class BatchingMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that writes its buffered records to a stream target in one call"""
+    
+    def flush(self):
+        """Format every buffered record and write them with a single stream write"""
+        self.acquire()
+        try:
+            target = self.target
+            stream = getattr(target, 'stream', None)
+            if stream is None:
+                # Not a stream handler (or not opened yet): hand records over one by one
+                super().flush()
+                return
+            if not self.buffer:
+                return
+            
+            # Like StreamHandler.emit, a failing record is reported through
+            # handleError instead of raising out of logging
+            lines = []
+            for record in self.buffer:
+                if record.levelno < target.level or not target.filter(record):
+                    continue
+                try:
+                    lines.append(target.format(record) + target.terminator)
+                except RecursionError:
+                    raise
+                except Exception:
+                    target.handleError(record)
+            
+            if lines:
+                target.acquire()
+                try:
+                    stream.write(''.join(lines))
+                    target.flush()
+                except RecursionError:
+                    raise
+                except Exception:
+                    target.handleError(self.buffer[-1])
+                finally:
+                    target.release()
+            self.buffer.clear()
+        finally:
+            self.release()
+
+@contextmanager
+def buffered_logging(logger, capacity=10000):
+    """
+    Buffer a logger's records and write them in one batch per handler
+    
+    Records are flushed when the block exits, when capacity is reached, or
+    immediately once an ERROR record is logged.
+    """
+    handlers = logger.handlers[:]
+    buffers = [
+        BatchingMemoryHandler(capacity, flushLevel=logging.ERROR, target=handler)
+        for handler in handlers
+    ]
+    for handler in handlers:
+        logger.removeHandler(handler)
+    for buffer in buffers:
+        logger.addHandler(buffer)
+    
+    try:
+        yield logger
+    finally:
+        try:
+            for buffer in buffers:
+                logger.removeHandler(buffer)
+                buffer.close()  # Flushes remaining records; the target stays open
+        finally:
+            # Put the original handlers back even if a final flush failed
+            for handler in handlers:
+                logger.addHandler(handler)
+
 # ─── API CONFIGURATION ────────────────────────────────────────────────────────
 # API credentials and settings
 API_USER = "thenecpt"
@@ -131,9 +233,68 @@ MAIN_PROCESS_LOG = "main_process_logger.log"
 JSON_DATA_FILE_PREFIX = "json_fetch_data"
 
 def get_daily_json_filename():
-    """Get the daily JSON filename with Eastern timezone date"""
+    """Get the daily NDJSON data filename with Eastern timezone date"""
     date_suffix = get_file_date_suffix()
-    return f"{JSON_DATA_FILE_PREFIX}_{date_suffix}.json"
+    return f"{JSON_DATA_FILE_PREFIX}_{date_suffix}.ndjson"
+
+def get_daily_meta_filename():
+    """Get the daily header filename (date/created_at) for the NDJSON data file"""
+    date_suffix = get_file_date_suffix()
+    return f"{JSON_DATA_FILE_PREFIX}_{date_suffix}.meta.json"
+
+# ─── DATA FILE READING ────────────────────────────────────────────────────────
+def find_latest_data_file():
+    """Get the latest daily data file (NDJSON or legacy JSON), or None if there is none"""
+    data_files = (
+        f for pattern in (f'{JSON_DATA_FILE_PREFIX}_*.ndjson', f'{JSON_DATA_FILE_PREFIX}_*.json')
+        for f in glob.iglob(pattern)
+        if not f.endswith('.meta.json')
+    )
+    # Names embed the date, so the lexical maximum is the latest file
+    return max(data_files, default=None)
+
+def open_data_file(json_file):
+    """Open a data file for binary reading, decompressing .zst archives on the fly"""
+    if json_file.endswith('.zst'):
+        reader = zstd.ZstdDecompressor().stream_reader(open(json_file, 'rb'))
+        return io.BufferedReader(reader, buffer_size=1 << 20)
+    return open(json_file, 'rb', buffering=1 << 20)
+
+def iter_entries(json_file, logger=None):
+    """
+    Yield log entries (dicts) from a data file one at a time
+    
+    NDJSON files are read line by line; legacy files holding a single
+    {"entries": [...]} document are streamed with ijson. Either may be a
+    zstd-compressed archive. Lines that are not valid JSON objects are
+    skipped with a warning on logger (this module's logger by default).
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+    
+    with open_data_file(json_file) as f:
+        if not json_file.removesuffix('.zst').endswith('.ndjson'):
+            for entry in ijson.items(f, 'entries.item'):
+                if isinstance(entry, dict):
+                    yield entry
+                else:
+                    logger.warning(f"⚠️ Skipping non-object entry: {entry!r:.80}")
+            return
+        
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = orjson.loads(line)
+            except ValueError as e:
+                # A torn line from an interrupted run; the writer ends it with a newline
+                # before appending again, so only that entry is lost
+                logger.warning(f"⚠️ Skipping invalid line {line_number}: {str(e)}")
+                continue
+            if isinstance(entry, dict):
+                yield entry
+            else:
+                logger.warning(f"⚠️ Skipping line {line_number}: not a JSON object")
 
 # ─── EXAMPLE USAGE ────────────────────────────────────────────────────────────
 if __name__ == "__main__":
@@ -144,6 +305,7 @@ if __name__ == "__main__":
     print(f"Time only: {format_time()}")
     print(f"ISO timestamp: {get_iso_timestamp()}")
     print(f"Daily JSON file: {get_daily_json_filename()}")
+    print(f"Daily header file: {get_daily_meta_filename()}")
     
     # Test logger
     test_logger = setup_logger('test', 'test_config.log')
@@ -4,18 +4,22 @@ JSON FETCH (STEP 1) - Centralized JSON Logging Version
 ======================================================
 
 This script fetches data from all thesports.com API endpoints
-and logs everything to a centralized daily JSON file that rotates at midnight.
+and logs everything to a centralized daily NDJSON file (one entry per line)
+that rotates at midnight.
 """
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import hashlib
-import json
+import orjson
+import zstandard as zstd
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import config  # Import universal config
 
 # ─── credentials & retry settings ───────────────────────────────────────────────
@@ -35,6 +39,21 @@ _URLS = {
     "country":      f"{_BASE}/country/list",
 }
 
+# ─── HTTP SESSION ──────────────────────────────────────────────────────────────
+# All endpoints share one host, so a pooled keep-alive session avoids a new
+# TCP+TLS handshake per request; transient 5xx responses are retried with backoff
+REQUEST_TIMEOUT = 10
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+    ),
+))
+
 # ─── MAIN PROCESS LOGGER SETUP ────────────────────────────────────────────────
 # Use universal config for logger setup
 main_logger = config.setup_logger('main_process', config.MAIN_PROCESS_LOG)
@@ -44,47 +63,64 @@ def get_json_filename():
     """Get the current JSON filename based on today's date in Eastern timezone"""
     return config.get_daily_json_filename()
 
+# Archived daily files are highly repetitive JSON and compress well
+_ZSTD_COMPRESSOR = zstd.ZstdCompressor(level=3, threads=-1)
+
+# Data file already checked by this process; later appends skip the rotation scan
+_CURRENT_FILE = None
+
 def rotate_json_file_if_needed():
     """Rotate JSON file if it's a new day"""
+    global _CURRENT_FILE
     current_file = get_json_filename()
+    if current_file == _CURRENT_FILE:
+        return current_file
+    
+    meta_file = config.get_daily_meta_filename()
     
     # Check if we need to rotate (if current file doesn't exist for today)
     if not os.path.exists(current_file):
         # Archive any existing files from previous days
-        for file in os.listdir('.'):
-            if file.startswith('json_fetch_data_') and file.endswith('.json') and file != current_file:
-                # Move to archive (keep last 30 days)
-                archive_name = f"archive_{file}"
-                if os.path.exists(archive_name):
-                    os.remove(archive_name)
-                shutil.move(file, archive_name)
+        with os.scandir('.') as entries:
+            for entry in entries:
+                file = entry.name
+                if (file.startswith('json_fetch_data_') and file.endswith(('.json', '.ndjson'))
+                        and file not in (current_file, meta_file)):
+                    if file.endswith('.meta.json'):
+                        # Move to archive (keep last 30 days); a single rename that
+                        # overwrites any existing archive of the same name
+                        os.replace(file, f"archive_{file}")
+                    else:
+                        # Compress data files into the archive, then drop the original
+                        with open(file, 'rb') as src, open(f"archive_{file}.zst", 'wb') as dst:
+                            _ZSTD_COMPRESSOR.copy_stream(src, dst)
+                        os.remove(file)
         
-        # Create new file with initial structure
-        initial_data = {
+        # Write the small header once; entries are appended to the NDJSON file
+        header = {
             "date": datetime.now().strftime("%Y-%m-%d"),
-            "created_at": datetime.now().isoformat(),
-            "entries": []
+            "created_at": datetime.now().isoformat()
         }
-        with open(current_file, 'w') as f:
-            json.dump(initial_data, f, indent=2)
+        with open(meta_file, 'wb') as f:
+            f.write(orjson.dumps(header, option=orjson.OPT_INDENT_2))
+        open(current_file, 'a').close()
+    elif os.path.getsize(current_file) > 0:
+        # A killed run can leave a torn last line without its newline; end it
+        # so our first append starts a fresh line and only the torn entry is lost
+        with open(current_file, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
     
+    _CURRENT_FILE = current_file
     return current_file
 
 def append_to_json_file(entry: Dict[str, Any]):
-    """Append an entry to the current JSON file"""
+    """Append an entry to the current NDJSON file as a single line"""
     filename = rotate_json_file_if_needed()
     
-    # Read existing data
-    with open(filename, 'r') as f:
-        data = json.load(f)
-    
-    # Append new entry
-    data["entries"].append(entry)
-    data["last_updated"] = datetime.now().isoformat()
-    
-    # Write back to file
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(filename, 'ab') as f:
+        f.write(orjson.dumps(entry) + b'\n')
 
 class APIError(Exception):
     """Custom exception for API related errors"""
@@ -92,10 +128,16 @@ class APIError(Exception):
 
 def generate_signature(params: Dict[str, Any]) -> str:
     """Generate API signature using MD5 hash"""
-    sorted_params = dict(sorted(params.items()))
-    string_to_sign = '&'.join([f"{k}={v}" for k, v in sorted_params.items()])
-    signature = hashlib.md5(string_to_sign.encode()).hexdigest()
-    return signature
+    # Feed "k1=v1&k2=v2..." to the hasher piece by piece instead of building the string
+    hasher = hashlib.md5()
+    separator = b''
+    for k, v in sorted(params.items()):
+        hasher.update(separator)
+        hasher.update(k.encode())
+        hasher.update(b'=')
+        hasher.update(str(v).encode())
+        separator = b'&'
+    return hasher.hexdigest()
 
 def make_api_request(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Make authenticated API request to specified endpoint"""
@@ -120,9 +162,9 @@ def make_api_request(endpoint: str, params: Optional[Dict[str, Any]] = None) ->
     
     try:
         # Make the API request
-        response = requests.get(url, params=request_params)
+        response = _SESSION.get(url, params=request_params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # Check API response status
         if "code" not in data:
@@ -139,7 +181,8 @@ def make_api_request(endpoint: str, params: Optional[Dict[str, Any]] = None) ->
         
         return data
         
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        # A non-JSON body (e.g. an HTML maintenance page) is a failed request too
         raise APIError(f"Request failed: {str(e)}")
 
 def log_api_data(endpoint: str, data: Dict[str, Any], records_count: int):
@@ -176,54 +219,58 @@ def fetch_all_endpoints():
     
     results = {}
     
-    for endpoint_name in _URLS.keys():
-        try:
+    # Endpoints are independent, so request them concurrently; responses are
+    # handled in this thread so appends to the JSON file stay sequential
+    with ThreadPoolExecutor(max_workers=len(_URLS)) as executor:
+        futures = {}
+        for endpoint_name in _URLS.keys():
             print(f"📡 Fetching {endpoint_name} endpoint...")
             main_logger.info(f"📡 Fetching {endpoint_name} endpoint...")
-            
-            # Make API request
-            data = make_api_request(endpoint_name)
-            
-            # Count records
-            records_count = len(data.get("results", [])) if "results" in data else 0
-            
-            # Log the data to centralized JSON file
-            log_api_data(endpoint_name, data, records_count)
-            
-            results[endpoint_name] = {
-                "status": "success",
-                "records": records_count
-            }
-            
-            print(f"✅ {endpoint_name}: {records_count} records")
-            main_logger.info(f"✅ {endpoint_name}: {records_count} records")
-            
-            # Add delay between requests to be respectful
-            time.sleep(1)
-            
-        except APIError as e:
-            error_msg = str(e)
-            log_api_error(endpoint_name, error_msg)
-            results[endpoint_name] = {
-                "status": "failed",
-                "error": error_msg,
-                "records": 0
-            }
-            print(f"❌ {endpoint_name}: {error_msg}")
-            main_logger.error(f"❌ {endpoint_name}: {error_msg}")
-            
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            log_api_error(endpoint_name, error_msg)
-            results[endpoint_name] = {
-                "status": "error",
-                "error": error_msg,
-                "records": 0
-            }
-            print(f"❌ {endpoint_name}: {error_msg}")
-            main_logger.error(f"❌ {endpoint_name}: {error_msg}")
+            futures[executor.submit(make_api_request, endpoint_name)] = endpoint_name
+        
+        for future in as_completed(futures):
+            endpoint_name = futures[future]
+            try:
+                data = future.result()
+                
+                # Count records
+                records_count = len(data.get("results", [])) if "results" in data else 0
+                
+                # Log the data to centralized JSON file
+                log_api_data(endpoint_name, data, records_count)
+                
+                results[endpoint_name] = {
+                    "status": "success",
+                    "records": records_count
+                }
+                
+                print(f"✅ {endpoint_name}: {records_count} records")
+                main_logger.info(f"✅ {endpoint_name}: {records_count} records")
+                
+            except APIError as e:
+                error_msg = str(e)
+                log_api_error(endpoint_name, error_msg)
+                results[endpoint_name] = {
+                    "status": "failed",
+                    "error": error_msg,
+                    "records": 0
+                }
+                print(f"❌ {endpoint_name}: {error_msg}")
+                main_logger.error(f"❌ {endpoint_name}: {error_msg}")
+                
+            except Exception as e:
+                error_msg = f"Unexpected error: {str(e)}"
+                log_api_error(endpoint_name, error_msg)
+                results[endpoint_name] = {
+                    "status": "error",
+                    "error": error_msg,
+                    "records": 0
+                }
+                print(f"❌ {endpoint_name}: {error_msg}")
+                main_logger.error(f"❌ {endpoint_name}: {error_msg}")
     
-    return results
+    # Keep the configured endpoint order for the summary
+    return {endpoint_name: results[endpoint_name] for endpoint_name in _URLS}
 
 def print_summary(results: Dict[str, Dict[str, Any]]):
     """Print summary of fetch results"""